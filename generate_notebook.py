@@ -22,22 +22,23 @@ This report details the methodology, statistical findings, and actionable recomm
     intro_code = """import pandas as pd
 import plotly.express as px
 import plotly.io as pio
-import json
-import urllib.request
+import os
+import sys
 
 # Configuration
 pio.templates.default = "plotly_dark"
 BASE_PATH = "../" # Relative path to project root
+sys.path.insert(0, os.path.join(BASE_PATH, 'src'))
+from data_cache import load_india_geojson
 
 # Load Cleaned Data
-dist_df = pd.read_csv(f"{BASE_PATH}aadhaar_pulse_district_clean.csv")
-state_df = pd.read_csv(f"{BASE_PATH}aadhaar_pulse_state_clean.csv")
-trend_df = pd.read_csv(f"{BASE_PATH}aadhaar_pulse_trends_clean.csv")
+dist_df = pd.read_parquet(f"{BASE_PATH}aadhaar_pulse_district_clean.parquet")
+state_df = pd.read_parquet(f"{BASE_PATH}aadhaar_pulse_state_clean.parquet")
+trend_df = pd.read_parquet(f"{BASE_PATH}aadhaar_pulse_trends_clean.parquet")
 
-# Load GeoJSON
-geojson_url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
-with urllib.request.urlopen(geojson_url) as url:
-    india_states = json.loads(url.read().decode())
+# Load GeoJSON (downloaded on first run, then read from the same local copy
+# the visualization scripts use)
+india_states = load_india_geojson(BASE_PATH)
 
 print("Data Loaded Successfully.")
 print(f"Districts Analyzed: {len(dist_df)}")
@@ -132,7 +133,7 @@ Our logical tagging detects a **"School Rush"** in June-August, correlating with
 
     section_3_plot = """# Seasonality Trend Analysis
 # Aggregating Monthly Volume
-trend_agg = trend_df.groupby(['month', 'season_type'])['volume'].sum().reset_index()
+trend_agg = trend_df.groupby(['month', 'season_type'], as_index=False, observed=True)['volume'].sum()
 trend_agg['month'] = trend_agg['month'].astype(str)
 
 fig_trend = px.bar(
@@ -152,28 +153,31 @@ fig_trend.show()
 3.  **Elastic Staffing**: Anticipate the **June Spike** (proven by Trend Analysis) by hiring temporary operators in May.
 """
 
-    # Add Cells
-    nb['cells'] = [
-        nbf.v4.new_markdown_cell(exec_summary),
-        nbf.v4.new_code_cell(intro_code),
+    # Add Cells, as (source, kind) pairs in display order
+    cell_specs = (
+        (exec_summary, 'markdown'),
+        (intro_code, 'code'),
         
-        nbf.v4.new_markdown_cell(section_1_md),
-        nbf.v4.new_code_cell(section_1_plot),
-        nbf.v4.new_code_cell(section_1_district),
+        (section_1_md, 'markdown'),
+        (section_1_plot, 'code'),
+        (section_1_district, 'code'),
         
-        nbf.v4.new_markdown_cell(section_2_md),
-        nbf.v4.new_code_cell(section_2_plot),
-        nbf.v4.new_code_cell(section_2_scatter),
+        (section_2_md, 'markdown'),
+        (section_2_plot, 'code'),
+        (section_2_scatter, 'code'),
         
-        nbf.v4.new_markdown_cell(section_3_md),
-        nbf.v4.new_code_cell(section_3_plot),
+        (section_3_md, 'markdown'),
+        (section_3_plot, 'code'),
         
-        nbf.v4.new_markdown_cell(rec_md)
-    ]
+        (rec_md, 'markdown')
+    )
+    new_cell = {'markdown': nbf.v4.new_markdown_cell, 'code': nbf.v4.new_code_cell}
+    nb.cells.extend(new_cell[kind](source) for source, kind in cell_specs)
     
     os.makedirs("notebooks", exist_ok=True)
-    with open('notebooks/AadhaarPulse_Final_Report.ipynb', 'w') as f:
-        nbf.write(nb, f)
+    # Already a v4 notebook, so skip the version conversion; one buffered write
+    with open('notebooks/AadhaarPulse_Final_Report.ipynb', 'w', buffering=1 << 20) as f:
+        nbf.write(nb, f, version=nbf.NO_CONVERT)
     
     print("Notebook created successfully at notebooks/AadhaarPulse_Final_Report.ipynb")
 
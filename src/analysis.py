@@ -6,10 +6,220 @@ Calculates the three pillars: SAI, CLCS, and DIH
 
 import pandas as pd
 import numpy as np
+from pandas.api.types import union_categoricals
+from scipy.stats import zscore
 import os
-from data_loader import load_and_merge_data, clean_column_names
+import glob
+import inspect
+from joblib import Memory
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from data_loader import load_and_merge_data, clean_column_names, downcast_counts
 from cleaning_utils import normalize_state_names, normalize_district_names
 
+# Age-bucket columns per dataset
+BIO_COLS = ['bio_age_5_17', 'bio_age_17_']
+DEMO_COLS = ['demo_age_5_17', 'demo_age_17_']
+ENROL_COLS = ['age_0_5', 'age_5_17', 'age_18_greater']
+
+# Seasonality rules (month numbers -> season), baked into a lookup table
+# indexed by month number (index 0 unused); every other month is 'Normal'
+SEASON_RULES = {
+    (6, 7, 8): 'School Rush',
+    (12,): 'Year End',
+    (3, 4): 'Financial Year End',
+}
+SEASON_TYPES = ['Normal'] + list(SEASON_RULES.values())
+SEASON_LUT = np.full(13, 'Normal', dtype=object)
+for _months, _season in SEASON_RULES.items():
+    SEASON_LUT[list(_months)] = _season
+
+
+def load_clean(base_path: str, pattern: str, signature: tuple) -> pd.DataFrame:
+    """
+    Loads one dataset and applies column, state and district cleaning.
+    
+    Meant to be wrapped in joblib.Memory: `signature` is unused in the body but
+    is part of the cache key (see source_signature).
+    
+    Args:
+        base_path: Base directory containing the data folders
+        pattern: Glob pattern of the dataset's CSV files
+        signature: Cache key from source_signature
+        
+    Returns:
+        Cleaned DataFrame
+    """
+    df = downcast_counts(clean_column_names(load_and_merge_data(base_path, pattern)))
+    df = normalize_state_names(df)
+    return normalize_district_names(df)
+
+
+def source_signature(base_path: str, pattern: str) -> tuple:
+    """
+    Builds the load_clean cache key: (path, mtime) of every matching CSV plus
+    the loader and cleaning modules, so editing either invalidates the cache.
+    """
+    paths = sorted(glob.glob(os.path.join(base_path, pattern)))
+    paths += [inspect.getfile(load_and_merge_data), inspect.getfile(normalize_district_names)]
+    return tuple((p, os.path.getmtime(p)) for p in paths)
+
+
+def parse_month_keys(dates: pd.Series) -> pd.Series:
+    """
+    Converts 'DD-MM-YYYY' date strings to integer month keys.
+    
+    Keys count months since 1970-01, which is the ordinal of a monthly Period,
+    so they can be turned back into Periods without re-parsing. Only the
+    distinct date strings are parsed.
+    
+    Args:
+        dates: Series of raw date strings
+        
+    Returns:
+        Int32 Series of month keys, <NA> where the date is unparseable
+    """
+    codes, uniques = pd.factorize(dates)
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), format='%d-%m-%Y', errors='coerce')
+    keys = ((parsed.year - 1970) * 12 + parsed.month - 1).to_numpy(dtype='float64')
+    
+    # Missing dates have code -1, which picks up the trailing NaN
+    keys = np.append(keys, np.nan)[codes]
+    return pd.Series(keys, index=dates.index).astype('Int32')
+
+
+def group_sums(keys: pd.Series, values: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-category column sums straight from the categorical codes.
+    
+    np.bincount does each column in one pass with none of groupby's dispatch
+    overhead. Like groupby(observed=True).sum(), only categories that occur
+    are returned, NaN counts as 0 and integer columns sum to int64.
+    
+    Args:
+        keys: Categorical Series of group keys
+        values: Columns to sum, aligned with keys
+        
+    Returns:
+        DataFrame of sums indexed by the occurring categories
+    """
+    codes = keys.cat.codes.to_numpy()
+    n_groups = len(keys.cat.categories)
+    present = np.flatnonzero(np.bincount(codes, minlength=n_groups))
+    
+    sums = {}
+    for col in values:
+        weights = values[col].to_numpy('float64', na_value=0)
+        total = np.bincount(codes, weights=weights, minlength=n_groups)[present]
+        sums[col] = total.astype(np.int64) if pd.api.types.is_integer_dtype(values[col]) else total
+    
+    index = pd.CategoricalIndex(pd.Categorical.from_codes(present, dtype=keys.dtype), name=keys.name)
+    return pd.DataFrame(sums, index=index)
+
+
+def monthly_volumes(districts: pd.Series, months: pd.Series, volume: pd.Series) -> pd.DataFrame:
+    """
+    Sums volume per (district, month) into a dense district x month grid.
+    
+    Each row lands in cell `district_code * n_months + month_code` and one
+    np.bincount fills the whole grid; the cells that received rows are read
+    back out in (district, month) order, same as a sorted groupby. Rows with
+    no month key are dropped.
+    
+    Args:
+        districts: Categorical Series of districts
+        months: Int32 Series of month keys (see parse_month_keys)
+        volume: Per-row volume, aligned with districts
+        
+    Returns:
+        DataFrame with district, integer month key and volume columns
+    """
+    dated = months.notna().to_numpy()
+    # Codes are int8/int16; widen them before building cell indices
+    district_codes = districts.cat.codes.to_numpy().astype(np.intp)[dated]
+    month_codes, month_keys = pd.factorize(months.to_numpy('int64', na_value=0)[dated], sort=True)
+    
+    n_months = len(month_keys)
+    cells = district_codes * n_months + month_codes
+    n_cells = len(districts.cat.categories) * n_months
+    filled = np.flatnonzero(np.bincount(cells, minlength=n_cells))
+    
+    weights = volume.to_numpy('float64', na_value=0)[dated]
+    totals = np.bincount(cells, weights=weights, minlength=n_cells)[filled]
+    if pd.api.types.is_integer_dtype(volume):
+        totals = totals.astype(np.int64)
+    
+    return pd.DataFrame({
+        'district': pd.Categorical.from_codes(filled // n_months, dtype=districts.dtype),
+        'month': month_keys[filled % n_months],
+        'volume': totals
+    })
+
+
+def safe_div(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """
+    Element-wise num / den where a zero denominator counts as 1.
+    
+    The output starts as a copy of num and np.divide only writes where den is
+    non-zero, so no guarded copy of the denominator is built.
+    """
+    return np.divide(num, den, out=num.copy(), where=den != 0)
+
+
+def pillar_scores(total_volume, active_pincodes, child_updates, total_child_activity) -> tuple:
+    """
+    Computes the SAI and CLCS scores on dense float64 arrays in one pass.
+    
+    Used for both the district and the state tables. Zero denominators are
+    treated as 1 (see safe_div); NaN inputs give NaN scores and are left out
+    of the z-score mean and standard deviation. The arithmetic runs in float64
+    and the scores are returned as float32.
+    
+    Returns:
+        Tuple of (sps_score, compliance_share, clcs_zscore) float32 arrays
+    """
+    total_volume, active_pincodes, child_updates, total_child_activity = (
+        np.asarray(a, dtype='float64')
+        for a in (total_volume, active_pincodes, child_updates, total_child_activity)
+    )
+    sps_score = safe_div(total_volume, active_pincodes)
+    compliance_share = safe_div(child_updates, total_child_activity)
+    clcs_zscore = zscore(compliance_share, ddof=1, nan_policy='omit')
+    return tuple(a.astype(np.float32) for a in (sps_score, compliance_share, clcs_zscore))
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest values, largest first.
+    
+    argpartition selects the top k in O(n); only those k are then sorted.
+    """
+    k = min(k, len(values))
+    if k == 0:
+        return np.array([], dtype=np.intp)
+    idx = np.argpartition(-values, k - 1)[:k]
+    return idx[np.argsort(-values[idx], kind='stable')]
+
+
+def save_output(df: pd.DataFrame, path_base: str) -> None:
+    """
+    Saves an output table as Parquet (fast columnar reads for the notebook and
+    downstream scripts) and as CSV (for people and spreadsheet tools).
+    
+    The CSV goes through Arrow's multi-threaded writer rather than to_csv;
+    Arrow quotes string values and has no CSV form for Periods, so those are
+    written as their 'YYYY-MM' strings.
+    
+    Args:
+        df: Table to save
+        path_base: Output path without the file extension
+    """
+    df.to_parquet(path_base + '.parquet', engine='pyarrow', compression='zstd', index=False)
+    
+    periods = [col for col in df.columns if isinstance(df[col].dtype, pd.PeriodDtype)]
+    table = pa.Table.from_pandas(df.astype(dict.fromkeys(periods, str)), preserve_index=False)
+    pa_csv.write_csv(table, path_base + '.csv')
+
 
 def calculate_pillars(base_path: str) -> dict:
     """
@@ -22,141 +232,155 @@ def calculate_pillars(base_path: str) -> dict:
     print("🚀 AADHAAR PULSE 2.0 - Analysis Pipeline")
     print("=" * 60)
     
-    # --- STEP 0: LOAD DATA ---
-    print("\n📂 Loading Data...")
-    bio_df = clean_column_names(load_and_merge_data(base_path, "api_data_aadhar_biometric/*.csv"))
-    demo_df = clean_column_names(load_and_merge_data(base_path, "api_data_aadhar_demographic/*.csv"))
-    enrol_df = clean_column_names(load_and_merge_data(base_path, "api_data_aadhar_enrolment/*.csv"))
-    
-    print(f"   Raw counts - Bio: {len(bio_df):,}, Demo: {len(demo_df):,}, Enrol: {len(enrol_df):,}")
-    
-    # --- STEP 1: DEEP CLEANING (P0 Fix) ---
-    print("\n🧹 Performing Deep Data Cleaning...")
-    
-    # FIX: Properly reassign the cleaned DataFrames (not just loop variable)
-    bio_df = normalize_state_names(bio_df)
-    bio_df = normalize_district_names(bio_df)
-    
-    demo_df = normalize_state_names(demo_df)
-    demo_df = normalize_district_names(demo_df)
-    
-    enrol_df = normalize_state_names(enrol_df)
-    enrol_df = normalize_district_names(enrol_df)
+    # --- STEP 0: LOAD DATA + DEEP CLEANING (P0 Fix) ---
+    # Cleaned frames are cached on disk and reused until a CSV changes
+    print("\n📂 Loading & Cleaning Data...")
+    cached_load_clean = Memory(os.path.join(base_path, '.cache'), verbose=0).cache(load_clean)
+    
+    def load(pattern):
+        return cached_load_clean(base_path, pattern, source_signature(base_path, pattern))
+    
+    # One source at a time: each load already reads its files in parallel, so
+    # a second level of threads would oversubscribe the CPU and interleave
+    # the sources' progress messages
+    bio_df, demo_df, enrol_df = [load(pattern) for pattern in [
+        "api_data_aadhar_biometric/*.csv",
+        "api_data_aadhar_demographic/*.csv",
+        "api_data_aadhar_enrolment/*.csv"
+    ]]
+    
+    # Categorical keys so every groupby hashes small integer codes instead of
+    # strings; one shared category set keeps the concat below categorical.
+    frames = [bio_df, demo_df, enrol_df]
+    for col in ['district', 'state', 'pincode']:
+        keys = [df[col].astype('category') for df in frames]
+        # A source whose pincodes hold a stray token is read as strings; the
+        # others then use string keys too, so the category sets can merge
+        if len({key.cat.categories.dtype for key in keys}) > 1:
+            keys = [key.cat.rename_categories(key.cat.categories.astype(str)) for key in keys]
+        categories = union_categoricals(keys, sort_categories=True).categories
+        for df, key in zip(frames, keys):
+            df[col] = pd.Categorical(key, categories=categories)
     
     print(f"   Clean counts - Bio: {len(bio_df):,}, Demo: {len(demo_df):,}, Enrol: {len(enrol_df):,}")
     print(f"   Unique States: {enrol_df['state'].nunique()}")
     print(f"   Unique Districts: {enrol_df['district'].nunique()}")
     
     # Re-map District to State (using Mode to fix 'Adilabad' double-state issue)
-    dist_state_map = enrol_df.groupby('district')['state'].agg(
-        lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0]
-    ).reset_index()
+    # Stable sort keeps the alphabetically first state on ties, same as mode()
+    dist_state_map = (
+        enrol_df.groupby(['district', 'state'], observed=True).size()
+        .reset_index(name='n')
+        .sort_values('n', ascending=False, kind='stable')
+        .drop_duplicates('district')[['district', 'state']]
+    )
+    
+    # --- FUSED AGGREGATION ---
+    # Per-row totals first, so the groupbys below reduce one or two columns
+    # instead of every age bucket (demographic updates carry no child activity)
+    bio_df['_vol'] = bio_df[BIO_COLS].sum(axis=1)
+    bio_df['_child'] = bio_df['bio_age_5_17']
+    demo_df['_vol'] = demo_df[DEMO_COLS].sum(axis=1)
+    demo_df['_child'] = 0
+    enrol_df['_vol'] = enrol_df[ENROL_COLS].sum(axis=1)
+    enrol_df['_child'] = enrol_df[['age_0_5', 'age_5_17']].sum(axis=1)
+    
+    # Per-source district sums straight from the shared district codes
+    bio_sums, demo_sums, enrol_sums = (
+        group_sums(df['district'], df[['_vol', '_child']]) for df in frames
+    )
+    
+    # Active Pincodes: dedupe (district, pincode) pairs per source first so the
+    # count runs over unique pairs, not every transaction row
+    pins = pd.concat(
+        [df[['district', 'pincode']].drop_duplicates() for df in frames],
+        ignore_index=True
+    ).drop_duplicates()
+    active_pins = pins.groupby('district', observed=True)['pincode'].count()
+    
+    # Align all per-district inputs once; every metric below is a column
+    # expression on this frame (NaN where a district is absent from a source)
+    results = pd.DataFrame({
+        'bio_vol': bio_sums['_vol'],
+        'demo_vol': demo_sums['_vol'],
+        'enrol_vol': enrol_sums['_vol'],
+        'active_pincodes': active_pins,
+        'child_updates_5_17': bio_sums['_child'],
+        'enrol_child': enrol_sums['_child']
+    })
     
     # --- PILLAR 1: Service Accessibility Index (SAI) ---
     print("\n📊 Calculating Pillar 1: SAI (Service Pressure)...")
     
-    bio_vol = bio_df.groupby('district')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1)
-    demo_vol = demo_df.groupby('district')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1)
-    enrol_vol = enrol_df.groupby('district')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1)
-    
-    total_vol = bio_vol.add(demo_vol, fill_value=0).add(enrol_vol, fill_value=0)
-    
-    # Active Pincodes
-    all_pins = pd.concat([
-        bio_df[['district', 'pincode']],
-        demo_df[['district', 'pincode']],
-        enrol_df[['district', 'pincode']]
-    ])
-    active_pins = all_pins.groupby('district')['pincode'].nunique()
-    
-    sps_score = total_vol / active_pins.replace(0, 1)
+    results['total_volume'] = results[['bio_vol', 'demo_vol', 'enrol_vol']].sum(axis=1)
     
     # --- PILLAR 2: Child Lifecycle Compliance Score (CLCS) ---
     print("📊 Calculating Pillar 2: CLCS (Z-Score Benchmarking)...")
     
-    child_updates = bio_df.groupby('district')['bio_age_5_17'].sum()
-    c_enrol_0_5 = enrol_df.groupby('district')['age_0_5'].sum()
-    c_enrol_5_17 = enrol_df.groupby('district')['age_5_17'].sum()
-    
-    total_child_activity = child_updates.add(c_enrol_0_5, fill_value=0).add(c_enrol_5_17, fill_value=0)
-    
-    # Compliance Share
-    compliance_share = child_updates / total_child_activity.replace(0, 1)
+    results['total_child_activity'] = results[['child_updates_5_17', 'enrol_child']].sum(axis=1)
     
-    # Z-Score Calculation
-    national_mean = compliance_share.mean()
-    national_std = compliance_share.std()
-    clcs_zscore = (compliance_share - national_mean) / national_std
+    # SPS, Compliance Share and national Z-Score
+    results['sps_score'], results['compliance_share'], results['clcs_zscore'] = pillar_scores(
+        results['total_volume'], results['active_pincodes'],
+        results['child_updates_5_17'], results['total_child_activity']
+    )
     
     # --- PILLAR 3: Demand Intensity Heatmap (DIH) ---
     print("📊 Calculating Pillar 3: DIH (Seasonality Analysis)...")
     
-    # Parse dates
-    bio_df['date'] = pd.to_datetime(bio_df['date'], format='%d-%m-%Y', errors='coerce')
-    demo_df['date'] = pd.to_datetime(demo_df['date'], format='%d-%m-%Y', errors='coerce')
-    enrol_df['date'] = pd.to_datetime(enrol_df['date'], format='%d-%m-%Y', errors='coerce')
-
-    def agg_monthly(df, cols):
-        df = df.copy()
-        df['month'] = df['date'].dt.to_period('M')
-        return df.groupby(['district', 'month'])[cols].sum().sum(axis=1).reset_index(name='volume')
-
-    bio_m = agg_monthly(bio_df, ['bio_age_5_17', 'bio_age_17_'])
-    demo_m = agg_monthly(demo_df, ['demo_age_5_17', 'demo_age_17_'])
-    enrol_m = agg_monthly(enrol_df, ['age_0_5', 'age_5_17', 'age_18_greater'])
-    
-    all_activity = pd.concat([bio_m, demo_m, enrol_m])
-    district_monthly_total = all_activity.groupby(['district', 'month'])['volume'].sum().reset_index()
+    # Parse each source's dates into integer month keys (no Timestamp objects
+    # and no stacked string column), then accumulate all three sources' volumes
+    # on one dense district x month grid
+    district_monthly_total = monthly_volumes(
+        pd.concat([df['district'] for df in frames], ignore_index=True),
+        pd.concat([parse_month_keys(df['date']) for df in frames], ignore_index=True),
+        pd.concat([df['_vol'] for df in frames], ignore_index=True)
+    )
     
     # Seasonality Tags
-    def tag_season(month_obj):
-        m = month_obj.month
-        if m in [6, 7, 8]: return 'School Rush'
-        if m in [12]: return 'Year End'
-        if m in [3, 4]: return 'Financial Year End'
-        return 'Normal'
-        
-    district_monthly_total['season_type'] = district_monthly_total['month'].apply(tag_season)
+    month_keys = district_monthly_total['month'].to_numpy('int64')
+    district_monthly_total['season_type'] = pd.Categorical(
+        SEASON_LUT[month_keys % 12 + 1], categories=SEASON_TYPES
+    )
+    district_monthly_total['month'] = pd.arrays.PeriodArray(month_keys, dtype=pd.PeriodDtype('M'))
     
     # --- COMPILE RESULTS ---
     print("\n📊 Compiling Results...")
     
-    results = pd.DataFrame({
-        'total_volume': total_vol,
-        'active_pincodes': active_pins,
-        'sps_score': sps_score,
-        'child_updates_5_17': child_updates,
-        'total_child_activity': total_child_activity,
-        'compliance_share': compliance_share,
-        'clcs_zscore': clcs_zscore
-    }).reset_index()
-    
-    results = results.merge(dist_state_map, on='district', how='left')
+    metric_cols = [
+        'total_volume', 'active_pincodes', 'sps_score', 'child_updates_5_17',
+        'total_child_activity', 'compliance_share', 'clcs_zscore'
+    ]
+    results = results[metric_cols].rename_axis('district').reset_index()
+    
+    # Direct hash lookup against the small district->state table (no join)
+    results['state'] = results['district'].map(dist_state_map.set_index('district')['state'])
     results = results[results['state'].notna()]
-    results = results.fillna(0)
+    
+    # Only the metrics can be NaN (district missing from a source); filling
+    # them alone leaves the key columns untouched and the scores float32
+    results = results.fillna(dict.fromkeys(metric_cols, 0))
     
     # State Aggregation
-    state_results = results.groupby('state').agg({
+    state_results = results.groupby('state', as_index=False, observed=True).agg({
         'total_volume': 'sum',
         'active_pincodes': 'sum',
         'child_updates_5_17': 'sum',
         'total_child_activity': 'sum',
         'district': 'count'
-    }).reset_index()
+    })
     state_results = state_results.rename(columns={'district': 'num_districts'})
     
-    state_results['sps_score'] = state_results['total_volume'] / state_results['active_pincodes'].replace(0, 1)
-    state_results['compliance_share'] = state_results['child_updates_5_17'] / state_results['total_child_activity'].replace(0, 1)
-    
-    # State Z-Score
-    state_mean = state_results['compliance_share'].mean()
-    state_std = state_results['compliance_share'].std()
-    state_results['clcs_zscore'] = (state_results['compliance_share'] - state_mean) / state_std
+    # State SPS, Compliance Share and Z-Score
+    state_results['sps_score'], state_results['compliance_share'], state_results['clcs_zscore'] = pillar_scores(
+        state_results['total_volume'], state_results['active_pincodes'],
+        state_results['child_updates_5_17'], state_results['total_child_activity']
+    )
     
     # --- SAVE RESULTS ---
-    results.to_csv(os.path.join(base_path, 'aadhaar_pulse_district_clean.csv'), index=False)
-    state_results.to_csv(os.path.join(base_path, 'aadhaar_pulse_state_clean.csv'), index=False)
-    district_monthly_total.to_csv(os.path.join(base_path, 'aadhaar_pulse_trends_clean.csv'), index=False)
+    save_output(results, os.path.join(base_path, 'aadhaar_pulse_district_clean'))
+    save_output(state_results, os.path.join(base_path, 'aadhaar_pulse_state_clean'))
+    save_output(district_monthly_total, os.path.join(base_path, 'aadhaar_pulse_trends_clean'))
     
     # --- PRINT SUMMARY ---
     print("\n" + "=" * 60)
@@ -166,15 +390,19 @@ def calculate_pillars(base_path: str) -> dict:
     print(f"   📁 State Results: {len(state_results):,} states/UTs")
     print(f"   📁 Monthly Trends: {len(district_monthly_total):,} data points")
     
+    districts = results['district'].to_numpy()
+    states = results['state'].to_numpy()
+    
     print(f"\n   📈 Top 5 High-Pressure Districts (SAI):")
-    top_sps = results.nlargest(5, 'sps_score')[['district', 'state', 'sps_score']]
-    for _, row in top_sps.iterrows():
-        print(f"      - {row['district']} ({row['state']}): {row['sps_score']:,.0f}")
+    sps = results['sps_score'].to_numpy()
+    for i in top_k_indices(sps, 5):
+        print(f"      - {districts[i]} ({states[i]}): {sps[i]:,.0f}")
     
     print(f"\n   ⚠️ Top 5 At-Risk Districts (Low CLCS Z-Score):")
-    risk_districts = results[results['total_child_activity'] > 1000].nsmallest(5, 'clcs_zscore')[['district', 'state', 'clcs_zscore']]
-    for _, row in risk_districts.iterrows():
-        print(f"      - {row['district']} ({row['state']}): {row['clcs_zscore']:.2f}σ")
+    zscores = results['clcs_zscore'].to_numpy()
+    active = np.flatnonzero(results['total_child_activity'].to_numpy() > 1000)
+    for i in active[top_k_indices(-zscores[active], 5)]:
+        print(f"      - {districts[i]} ({states[i]}): {zscores[i]:.2f}σ")
     
     return {
         'district': results,
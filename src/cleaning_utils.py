@@ -1,5 +1,7 @@
 import pandas as pd
-import re
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 
 # Valid Indian States/UTs (Official 36)
 VALID_STATES = {
@@ -12,6 +14,34 @@ VALID_STATES = {
     'Daman & Diu', 'Delhi', 'Jammu & Kashmir', 'Ladakh', 'Lakshadweep', 'Puducherry'
 }
 
+# RE2 patterns for the Arrow regex kernels (plain strings; Arrow compiles them)
+# Runs of whitespace. RE2's \s is ASCII-only ([\t\n\f\r ]), so the rest of
+# what Python's \s matches (\v, \x1c-\x1f, \x85 and Unicode spaces such as
+# NBSP) is listed explicitly, keeping 'X\xa0Y' and 'X Y' the same district
+WHITESPACE_PATTERN = r'[\s\v\x1c-\x1f\x85\p{Z}]+'
+
+# A usable district name has a letter and at least 3 characters. Any such name
+# has a 3-character window around one of its letters, so one RE2 search covers
+# both checks (numeric-only names have no letter at all)
+VALID_DISTRICT_PATTERN = r'(?s)[a-zA-Z]..|.[a-zA-Z].|..[a-zA-Z]'
+GARBAGE_DISTRICTS = ['100000', '5th Cross', 'System']
+
+def _clean_categories(values, clean):
+    """
+    Runs a string-cleaning function on the distinct values of a column only.
+    `clean` receives the distinct values as an Arrow string array and returns
+    the cleaned values, NaN for values to drop. Returns a categorical whose codes
+    point at the cleaned values, so no per-row string work is done.
+    """
+    cat = values.astype('category')
+    names = pa.array(cat.cat.categories.astype(str), type=pa.string())
+    cleaned = pd.Index(clean(names))
+    new_codes, new_categories = pd.factorize(cleaned)
+    
+    # Missing input has code -1, which picks up the trailing -1
+    codes = np.append(new_codes, -1)[cat.cat.codes.to_numpy()]
+    return pd.Categorical.from_codes(codes, categories=new_categories)
+
 def normalize_state_names(df):
     """
     Standardizes state names to official 36 State/UT format.
@@ -23,9 +53,6 @@ def normalize_state_names(df):
     
     df = df.copy()  # Avoid SettingWithCopyWarning
     
-    # Standardize casing first (lowercase for matching, then apply proper case)
-    df['state'] = df['state'].astype(str).str.strip().str.lower()
-    
     # State Mapping Dictionary (all lowercase keys for matching)
     state_map = {
         # West Bengal variations
@@ -74,8 +101,16 @@ def normalize_state_names(df):
         'chandigarh': 'Chandigarh', 'ladakh': 'Ladakh', 'lakshadweep': 'Lakshadweep'
     }
     
-    # Apply Mapping
-    df['state'] = df['state'].map(lambda x: state_map.get(x, None))
+    def clean(states):
+        # Standardize casing first (lowercase for matching, then apply proper case)
+        states = pc.utf8_lower(pc.utf8_trim_whitespace(states))
+        
+        # Apply Mapping
+        states = pd.Index(states.to_numpy(zero_copy_only=False))
+        return states.map(state_map)
+    
+    # Cleaned once per distinct name; the result is categorical
+    df['state'] = _clean_categories(df['state'], clean)
     
     # Remove rows with invalid/unmapped states (garbage like '0', '100000', 'state')
     df = df.dropna(subset=['state'])
@@ -90,13 +125,6 @@ def normalize_district_names(df):
     if 'district' not in df.columns:
         return df
         
-    df = df.dropna(subset=['district'])
-    df['district'] = df['district'].astype(str).str.strip().str.title()
-    
-    # 1. Regex Cleaning (Remove extra spaces, dots)
-    df['district'] = df['district'].replace(r'\s+', ' ', regex=True)
-    df['district'] = df['district'].replace(r'\.', '', regex=True) # W.Godavari -> W Godavari
-    
     # 2. Hard-coded Duplication Fixes
     dist_map = {
         # Bengaluru
@@ -148,19 +176,30 @@ def normalize_district_names(df):
         'Tuticorin': 'Thoothukkudi', 'Thoothukkudi': 'Thoothukkudi'
     }
     
-    # Context-aware replacement is hard without state column in the map function.
-    # For now, distinct names are mapped globally.
-    df['district'] = df['district'].map(lambda x: dist_map.get(x, x))
-    
-    # 3. Garbage Removal
-    # Filter out numeric districts, "?", "5th Cross"
-    # Keep only if it has at least one letter and length > 2
-    mask_valid = (
-        df['district'].str.contains(r'[a-zA-Z]') & 
-        (df['district'].str.len() > 2) & 
-        (~df['district'].str.contains(r'^\d+$')) &
-        (~df['district'].isin(['100000', '5th Cross', 'System']))
-    )
-    df = df[mask_valid]
+    def clean(districts):
+        districts = pc.utf8_title(pc.utf8_trim_whitespace(districts))
+        
+        # 1. Regex Cleaning (Remove extra spaces, dots)
+        districts = pc.replace_substring_regex(districts, WHITESPACE_PATTERN, ' ')
+        districts = pc.replace_substring(districts, '.', '') # W.Godavari -> W Godavari
+        
+        # Context-aware replacement is hard without state column in the map function.
+        # For now, distinct names are mapped globally.
+        districts = pd.Index(districts.to_numpy(zero_copy_only=False))
+        mapped = districts.map(dist_map)
+        districts = mapped.where(mapped.notna(), districts)
+        
+        # 3. Garbage Removal
+        # Filter out numeric districts, "?", "5th Cross"
+        # Keep only if it has at least one letter and length > 2
+        names = pa.array(districts, type=pa.string())
+        mask_valid = np.logical_and(
+            pc.match_substring_regex(names, VALID_DISTRICT_PATTERN).to_numpy(zero_copy_only=False),
+            ~districts.isin(GARBAGE_DISTRICTS)
+        )
+        return districts.where(mask_valid)
     
-    return df
+    # Cleaned once per distinct name; the result is categorical
+    df = df.copy()
+    df['district'] = _clean_categories(df['district'], clean)
+    return df.dropna(subset=['district'])
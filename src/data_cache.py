@@ -0,0 +1,112 @@
+"""
+Shared Loader for the Analysis Outputs
+======================================
+Reads the clean district, state and trends tables written by analysis.py
+once per process, so the image export and the visualization modules share
+one copy instead of re-parsing the CSVs on every call. Also keeps the one
+local copy of the India state boundaries GeoJSON, in `base_path/.cache/`
+next to the other caches.
+"""
+
+import os
+import gzip
+import json
+import urllib.request
+from functools import lru_cache
+import pandas as pd
+from data_loader import clean_column_names, downcast_numeric
+
+# GeoJSON includes J&K and Ladakh
+INDIA_GEOJSON_URL = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
+# Seconds without a response before the download is abandoned
+INDIA_GEOJSON_TIMEOUT = 5
+
+try:
+    # C decoder, noticeably faster on the nested polygon coordinate arrays
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Output table name -> file name (without extension) written by analysis.py
+OUTPUT_FILES = {
+    'district': 'aadhaar_pulse_district_clean',
+    'state': 'aadhaar_pulse_state_clean',
+    'trends': 'aadhaar_pulse_trends_clean',
+}
+
+
+@lru_cache(maxsize=None)
+def _read_output(path_base: str, mtime: float, columns: tuple = None) -> pd.DataFrame:
+    """
+    Reads one output table, preferring the Parquet file over the CSV, with
+    numeric columns downcast to their smallest fitting dtype. Only `columns`
+    are parsed when given.
+
+    `mtime` is unused in the body but is part of the cache key, so a table
+    rewritten by a new analysis run is read again.
+    """
+    columns = list(columns) if columns else None
+    if os.path.exists(path_base + '.parquet'):
+        df = pd.read_parquet(path_base + '.parquet', engine='pyarrow', columns=columns)
+        # Months come back as 'YYYY-MM' strings, same as from the CSV
+        periods = [col for col in df.columns if isinstance(df[col].dtype, pd.PeriodDtype)]
+        df = df.astype(dict.fromkeys(periods, str))
+    else:
+        try:
+            # Multi-threaded Arrow parser
+            df = pd.read_csv(path_base + '.csv', usecols=columns, engine='pyarrow')
+        except ImportError:
+            df = pd.read_csv(path_base + '.csv', usecols=columns)
+        df = clean_column_names(df)
+    return downcast_numeric(df)
+
+
+def load_clean(base_path: str, name: str, columns: tuple = None) -> pd.DataFrame:
+    """
+    Loads a clean analysis output ('district', 'state' or 'trends').
+
+    Args:
+        base_path: Directory the analysis outputs were written to
+        name: Output table name
+        columns: Columns to read (all when None)
+
+    Returns:
+        DataFrame copy of the cached table (safe for callers to modify)
+    """
+    path_base = os.path.join(base_path, OUTPUT_FILES[name])
+    source = path_base + '.parquet' if os.path.exists(path_base + '.parquet') else path_base + '.csv'
+    columns = tuple(columns) if columns else None
+    return _read_output(path_base, os.path.getmtime(source), columns).copy()
+
+
+@lru_cache(maxsize=None)
+def load_india_geojson(base_path: str) -> dict:
+    """
+    Loads the India state boundaries GeoJSON.
+
+    The file is downloaded once into `base_path/.cache/` and read from disk
+    after that, so repeat runs need no network access.
+
+    Args:
+        base_path: Directory the analysis outputs were written to
+
+    Returns:
+        Decoded GeoJSON FeatureCollection
+    """
+    cache_dir = os.path.join(base_path, '.cache')
+    path = os.path.join(cache_dir, 'india_states.geojson')
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # Download next to the target and rename, so a failed download never
+        # leaves a truncated file behind
+        partial_path = path + '.part'
+        request = urllib.request.Request(INDIA_GEOJSON_URL, headers={'Accept-Encoding': 'gzip'})
+        with urllib.request.urlopen(request, timeout=INDIA_GEOJSON_TIMEOUT) as response:
+            data = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                data = gzip.decompress(data)
+        with open(partial_path, 'wb') as f:
+            f.write(data)
+        os.replace(partial_path, path)
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
@@ -5,68 +5,300 @@ Handles loading and merging of multiple CSV files for each dataset.
 """
 
 import pandas as pd
+import numpy as np
 import os
 import glob
+import fnmatch
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
+# Label columns of the three Aadhaar datasets, pinned as strings so names and
+# dates stay strings even when a file happens to hold only numeric-looking
+# values. Counts and pincode are inferred per file: files with gaps hold counts
+# written as '21.0', and a strict int type would reject the whole file;
+# downcast_counts narrows them afterwards.
+CSV_COLUMN_TYPES = {
+    'date': pa.string(), 'state': pa.string(), 'district': pa.string(),
+}
+CSV_CONVERT_OPTIONS = pa_csv.ConvertOptions(column_types=CSV_COLUMN_TYPES)
 
-def load_and_merge_data(base_path: str, pattern: str) -> pd.DataFrame:
+# Low-cardinality label columns; as categoricals, groupby/isin work on integer
+# codes and each distinct name is stored once
+CATEGORICAL_COLS = ('state', 'district', 'season_type')
+
+
+def _safe_read(file: str):
+    """
+    Reads one CSV file into an Arrow table.
+    
+    Returns:
+        (table, None), or (None, error message) if the read fails; the caller
+        reports errors, so worker threads never print
+    """
+    try:
+        # PyArrow parses with a multi-threaded columnar reader
+        return pa_csv.read_csv(file, convert_options=CSV_CONVERT_OPTIONS), None
+    except Exception as e:
+        return None, f"❌ Error loading {file}: {e}"
+
+
+def _concat_tables(tables: list) -> pa.Table:
+    """
+    Concatenates per-file tables whose inferred column types may differ.
+    
+    Numeric types are widened (int64 + double -> double) and columns missing
+    from some files are null-filled. A column that has no common type (int64
+    in one file, string in another) is cast to string in every file, as
+    pd.concat would have produced an object column for it.
+    """
+    try:
+        return pa.concat_tables(tables, promote_options='permissive')
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        pass
+    
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            types.setdefault(field.name, set()).add(field.type)
+    conflicting = set()
+    for name, field_types in types.items():
+        try:
+            pa.unify_schemas([pa.schema([(name, t)]) for t in field_types], promote_options='permissive')
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            conflicting.add(name)
+    
+    tables = [
+        table.cast(pa.schema([
+            (f.name, pa.string()) if f.name in conflicting else f for f in table.schema
+        ], metadata=table.schema.metadata))
+        for table in tables
+    ]
+    return pa.concat_tables(tables, promote_options='permissive')
+
+
+def _list_source_files(full_path: str) -> dict:
+    """
+    Finds the non-empty files matching a glob pattern, with their sizes and mtimes.
+    
+    One os.scandir pass returns names, sizes and mtimes together, so there is
+    no separate stat per file; zero-byte files are dropped before any read.
+    Patterns with wildcards in the directory part fall back to glob.
+    
+    Returns:
+        Dict of path -> (size, mtime), sorted by path
+    """
+    directory, name_pattern = os.path.split(full_path)
+    if glob.has_magic(directory):
+        stats = {path: os.stat(path) for path in glob.glob(full_path)}
+    else:
+        try:
+            with os.scandir(directory) as entries:
+                stats = {
+                    entry.path: entry.stat() for entry in entries
+                    # glob skips hidden files unless the pattern names them
+                    if fnmatch.fnmatch(entry.name, name_pattern) and entry.is_file()
+                    and (name_pattern.startswith('.') or not entry.name.startswith('.'))
+                }
+        except FileNotFoundError:
+            stats = {}
+    
+    return {path: (st.st_size, st.st_mtime) for path, st in sorted(stats.items()) if st.st_size > 0}
+
+
+def _source_fingerprint(sources: dict) -> str:
+    """
+    Builds the Parquet cache key: (path, size, mtime) of every matching CSV
+    plus the mtime of this module, so adding, removing or replacing a file,
+    or editing the loader (e.g. CSV_COLUMN_TYPES), invalidates the cache.
+    """
+    entries = [(path, size, mtime) for path, (size, mtime) in sources.items()]
+    entries.append((__file__, os.path.getmtime(__file__)))
+    return hashlib.md5(repr(entries).encode()).hexdigest()
+
+
+def _cached_fingerprint(cache_path: str):
+    """Returns the fingerprint stored in a cache file's metadata, or None."""
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return metadata.get(b'source_fingerprint', b'').decode() or None
+
+
+def load_and_merge_data(base_path: str, pattern: str, use_cache: bool = True) -> pd.DataFrame:
     """
     Loads multiple CSV files matching a pattern and merges them into a single DataFrame.
     
+    The merged table is cached as Parquet under `base_path/.cache/` and reused
+    while the matching files (paths, sizes, mtimes) and this module are
+    unchanged. This sits one step before the joblib cache in analysis.py:
+    that one also keys on the cleaning code, so after a cleaning change the
+    raw merge is still read from here instead of re-parsing every CSV, and
+    callers that do not clean (load_all_datasets) use it too.
+    
     Args:
         base_path: Base directory containing the data folders
         pattern: Glob pattern to match files (e.g., "api_data_aadhar_biometric/*.csv")
+        use_cache: Read from / write to the Parquet cache
     
     Returns:
         Merged DataFrame containing all data from matching files
     """
     full_path = os.path.join(base_path, pattern)
-    files = sorted(glob.glob(full_path))
+    sources = _list_source_files(full_path)
+    files = list(sources)
     
     if not files:
         print(f"⚠️ No files found for pattern: {full_path}")
         return pd.DataFrame()
     
+    cache_key = hashlib.md5(pattern.encode()).hexdigest()
+    cache_path = os.path.join(base_path, '.cache', f'{cache_key}.parquet')
+    fingerprint = _source_fingerprint(sources)
+    if use_cache and os.path.exists(cache_path):
+        if _cached_fingerprint(cache_path) == fingerprint:
+            merged_df = pd.read_parquet(cache_path, engine='pyarrow')
+            print(f"Loaded '{pattern}' from cache. Final shape: {merged_df.shape}")
+            return merged_df
+    
     print(f"Found {len(files)} files for pattern '{pattern}'. Loading...")
     
-    dfs = []
-    total_rows = 0
-    for file in files:
-        try:
-            df = pd.read_csv(file)
-            dfs.append(df)
-            total_rows += len(df)
-        except Exception as e:
-            print(f"❌ Error loading {file}: {e}")
-            
-    if not dfs:
+    # Files are independent, so read them concurrently; map keeps file order.
+    # Each parse also uses Arrow's shared CPU pool, so more threads than
+    # cores would only contend for it.
+    with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(files))) as executor:
+        results = list(executor.map(_safe_read, files))
+    for _, error in results:
+        if error:
+            print(error)
+    tables = [table for table, _ in results if table is not None]
+    
+    if not tables:
         return pd.DataFrame()
         
-    merged_df = pd.concat(dfs, ignore_index=True)
-    print(f"Successfully merged {len(dfs)} files. Final shape: {merged_df.shape}")
+    # Arrow concat only appends chunks (no copy, unless a column's type has
+    # to be unified). The single to_pandas() is the only other copy made.
+    n_files = len(tables)
+    merged = _concat_tables(tables)
+    del tables  # lets self_destruct free each column once it is converted
+    
+    if use_cache:
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            schema_metadata = {**(merged.schema.metadata or {}), b'source_fingerprint': fingerprint.encode()}
+            # Write next to the target and rename, so an interrupted write
+            # never leaves a truncated cache file behind
+            fd, partial_path = tempfile.mkstemp(dir=cache_dir, suffix='.parquet.part')
+            os.close(fd)
+            try:
+                pq.write_table(merged.replace_schema_metadata(schema_metadata), partial_path, compression='zstd')
+                os.replace(partial_path, cache_path)
+            except BaseException:
+                os.remove(partial_path)
+                raise
+        except OSError as e:
+            print(f"⚠️ Could not write cache {cache_path}: {e}")
+    
+    merged_df = merged.to_pandas(split_blocks=True, self_destruct=True)
+    del merged
+    print(f"Successfully merged {n_files} files. Final shape: {merged_df.shape}")
     return merged_df
 
 
-def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
+def clean_column_names(df: pd.DataFrame, categorical_cols=CATEGORICAL_COLS) -> pd.DataFrame:
     """
-    Standardizes column names to lowercase and stripped of whitespace.
+    Standardizes column names to lowercase and stripped of whitespace, and
+    converts the low-cardinality label columns to categoricals.
     
     Args:
         df: Input DataFrame
+        categorical_cols: Columns (after renaming) to store as category
         
     Returns:
         DataFrame with cleaned column names
     """
     if df.empty:
         return df
-    df.columns = df.columns.str.strip().str.lower()
+    df.columns = [col.strip().lower() for col in df.columns]
+    for col in categorical_cols:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def downcast_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts integer columns (age-bucket counts, pincode) to int32 and float
+    columns (counts from files with gaps, read as float64) to float32.
+    
+    Per-row counts are small, so 32-bit values halve their memory and the bytes
+    every groupby-sum has to move. Integer group sums still come out as int64;
+    float32 holds whole counts exactly up to 2**24.
+    
+    Args:
+        df: Input DataFrame
+        
+    Returns:
+        DataFrame with 32-bit numeric columns
+    """
+    if df.empty:
+        return df
+    int_cols = df.select_dtypes('integer').columns
+    df[int_cols] = df[int_cols].astype(np.int32)
+    float_cols = df.select_dtypes('floating').columns
+    df[float_cols] = df[float_cols].astype(np.float32)
     return df
 
 
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts every numeric column to the smallest dtype that holds its values
+    (e.g. num_districts -> int8, volumes -> int32, float64 scores -> float32).
+    
+    Meant for the small analysis output tables read back for charting, where
+    the values are final; raw counts that still get summed use downcast_counts.
+    
+    Args:
+        df: Input DataFrame
+        
+    Returns:
+        DataFrame with downcast numeric columns
+    """
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes('floating').columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    return df
+
+
+# Dataset name -> glob pattern of its CSV files
+DATASET_PATTERNS = {
+    'enrolment': "api_data_aadhar_enrolment/*.csv",
+    'demographic': "api_data_aadhar_demographic/*.csv",
+    'biometric': "api_data_aadhar_biometric/*.csv",
+}
+
+
+def _load_and_clean(base_path: str, pattern: str) -> pd.DataFrame:
+    """
+    Loads and column-cleans one dataset. Top-level so that worker processes
+    can pickle it.
+    """
+    return downcast_counts(clean_column_names(load_and_merge_data(base_path, pattern)))
+
+
 def load_all_datasets(base_path: str) -> dict:
     """
     Convenience function to load all three Aadhaar datasets.
     
+    The datasets are independent, so each is loaded in its own process (with
+    its files read concurrently inside it).
+    
     Args:
         base_path: Base directory containing the data folders
         
@@ -77,25 +309,15 @@ def load_all_datasets(base_path: str) -> dict:
     print("📂 Loading All Aadhaar Datasets")
     print("=" * 60)
     
-    datasets = {}
-    
-    # Enrolment Data
-    print("\n1️⃣ Enrolment Data...")
-    datasets['enrolment'] = clean_column_names(
-        load_and_merge_data(base_path, "api_data_aadhar_enrolment/*.csv")
-    )
-    
-    # Demographic Update Data
-    print("\n2️⃣ Demographic Update Data...")
-    datasets['demographic'] = clean_column_names(
-        load_and_merge_data(base_path, "api_data_aadhar_demographic/*.csv")
-    )
+    with ProcessPoolExecutor(max_workers=len(DATASET_PATTERNS)) as executor:
+        futures = {
+            name: executor.submit(_load_and_clean, base_path, pattern)
+            for name, pattern in DATASET_PATTERNS.items()
+        }
+        datasets = {name: future.result() for name, future in futures.items()}
     
-    # Biometric Update Data
-    print("\n3️⃣ Biometric Update Data...")
-    datasets['biometric'] = clean_column_names(
-        load_and_merge_data(base_path, "api_data_aadhar_biometric/*.csv")
-    )
+    for name, df in datasets.items():
+        print(f"   {name.title()}: {len(df):,} rows")
     
     print("\n" + "=" * 60)
     print("✅ All datasets loaded successfully!")
@@ -119,7 +341,10 @@ if __name__ == "__main__":
             print(f"   Rows: {len(df):,}")
             print(f"   Columns: {df.columns.tolist()}")
             if 'date' in df.columns:
-                print(f"   Date Range: {df['date'].min()} to {df['date'].max()}")
+                # One fixed-format parse after the merge ('DD-MM-YYYY' strings
+                # do not sort chronologically as text)
+                dates = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce', cache=True)
+                print(f"   Date Range: {dates.min().date()} to {dates.max().date()}")
             if 'state' in df.columns:
                 print(f"   Unique States: {df['state'].nunique()}")
 
@@ -5,9 +5,22 @@ Generates high-resolution PNG images for all visualizations.
 """
 
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 import os
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from data_cache import load_clean
+from analysis import top_k_indices
+
+# Palette size for the exported PNGs. Charts use a handful of flat colours,
+# so an 8-bit palette image looks the same as true colour at a fraction of
+# the file size.
+PNG_COLORS = 64
+
 
 def export_all_images(base_path: str):
     """Export all visualizations as PNG images."""
@@ -17,17 +30,20 @@ def export_all_images(base_path: str):
     print("=" * 60)
     
     # Load data
-    district_df = pd.read_csv(os.path.join(base_path, 'aadhaar_pulse_district_clean.csv'))
-    state_df = pd.read_csv(os.path.join(base_path, 'aadhaar_pulse_state_clean.csv'))
-    trends_df = pd.read_csv(os.path.join(base_path, 'aadhaar_pulse_trends_clean.csv'))
+    district_df = load_clean(base_path, 'district')
+    state_df = load_clean(base_path, 'state')
+    trends_df = load_clean(base_path, 'trends')
     
     # Create output directory
     img_dir = os.path.join(base_path, 'images')
     os.makedirs(img_dir, exist_ok=True)
     
+    # (figure, file name) pairs, rendered together once all are built
+    figures = []
+    
     # --- 1. SAI Bar Chart ---
     print("\n1️⃣ Exporting SAI Bar Chart...")
-    top_pressure = district_df.nlargest(20, 'sps_score')
+    top_pressure = district_df.iloc[top_k_indices(district_df['sps_score'].to_numpy(), 20)]
     
     fig_sps = px.bar(
         top_pressure,
@@ -40,12 +56,11 @@ def export_all_images(base_path: str):
         color_discrete_sequence=px.colors.qualitative.Set2
     )
     fig_sps.update_layout(xaxis_tickangle=-45, height=500, width=1000)
-    fig_sps.write_image(os.path.join(img_dir, '01_sai_top20.png'), scale=2)
-    print("   ✅ Saved: 01_sai_top20.png")
+    figures.append((fig_sps, '01_sai_top20.png'))
     
     # --- 2. CLCS Risk Scatter ---
     print("\n2️⃣ Exporting CLCS Risk Scatter...")
-    active_districts = district_df[district_df['total_child_activity'] > 1000]
+    active_districts = district_df.iloc[np.flatnonzero(district_df['total_child_activity'].to_numpy() > 1000)]
     
     fig_risk = px.scatter(
         active_districts,
@@ -61,8 +76,7 @@ def export_all_images(base_path: str):
     )
     fig_risk.add_hline(y=-1.5, line_dash="dash", line_color="red", annotation_text="HIGH RISK (-1.5σ)")
     fig_risk.add_hline(y=0, line_dash="dot", line_color="gray")
-    fig_risk.write_image(os.path.join(img_dir, '02_clcs_risk_scatter.png'), scale=2)
-    print("   ✅ Saved: 02_clcs_risk_scatter.png")
+    figures.append((fig_risk, '02_clcs_risk_scatter.png'))
     
     # --- 3. State-wise Bar Chart (Replacing Map) ---
     print("\n3️⃣ Exporting State Compliance Bar Chart...")
@@ -71,8 +85,10 @@ def export_all_images(base_path: str):
     state_sorted = state_df.sort_values('clcs_zscore', ascending=True)
     
     # Color based on risk level
-    state_sorted['risk_level'] = state_sorted['clcs_zscore'].apply(
-        lambda x: 'High Risk' if x < -1 else ('At Risk' if x < 0 else 'Good')
+    z = state_sorted['clcs_zscore'].to_numpy()
+    state_sorted['risk_level'] = pd.Categorical(
+        np.select([z < -1, z < 0], ['High Risk', 'At Risk'], default='Good'),
+        categories=['High Risk', 'At Risk', 'Good']
     )
     
     fig_state = px.bar(
@@ -94,12 +110,11 @@ def export_all_images(base_path: str):
     fig_state.add_vline(x=0, line_dash="dash", line_color="gray", annotation_text="National Avg")
     fig_state.add_vline(x=-1.5, line_dash="dash", line_color="red", annotation_text="Critical")
     fig_state.update_layout(showlegend=True, yaxis={'categoryorder': 'total ascending'})
-    fig_state.write_image(os.path.join(img_dir, '03_state_compliance.png'), scale=2)
-    print("   ✅ Saved: 03_state_compliance.png")
+    figures.append((fig_state, '03_state_compliance.png'))
     
     # --- 4. Seasonality Trend ---
     print("\n4️⃣ Exporting Seasonality Trend...")
-    national_trend = trends_df.groupby(['month', 'season_type'])['volume'].sum().reset_index()
+    national_trend = trends_df.groupby(['month', 'season_type'], as_index=False, observed=True)['volume'].sum()
     national_trend['month'] = national_trend['month'].astype(str)
     
     fig_trend = px.bar(
@@ -118,14 +133,21 @@ def export_all_images(base_path: str):
         },
         height=450, width=1000
     )
-    fig_trend.write_image(os.path.join(img_dir, '04_seasonality_trend.png'), scale=2)
-    print("   ✅ Saved: 04_seasonality_trend.png")
+    figures.append((fig_trend, '04_seasonality_trend.png'))
     
     # --- 5. Demand Heatmap ---
     print("\n5️⃣ Exporting Demand Heatmap...")
-    top_districts = district_df.nlargest(15, 'total_volume')['district'].tolist()
-    heatmap_data = trends_df[trends_df['district'].isin(top_districts)]
-    heatmap_pivot = heatmap_data.pivot_table(index='district', columns='month', values='volume', aggfunc='sum')
+    top_districts = district_df['district'].to_numpy()[
+        top_k_indices(district_df['total_volume'].to_numpy(), 15)
+    ].tolist()
+    # Membership test on the integer category codes, not the district strings
+    districts = trends_df['district'].cat
+    top_codes = districts.categories.get_indexer(top_districts)
+    top_codes = top_codes[top_codes >= 0]  # -1 would match missing districts
+    heatmap_data = trends_df.iloc[np.flatnonzero(np.isin(districts.codes.to_numpy(), top_codes))]
+    # The trends table already holds one row per (district, month), so the
+    # heatmap is a reshape with no aggregation; cells with no activity are 0
+    heatmap_pivot = heatmap_data.set_index(['district', 'month'])['volume'].unstack('month', fill_value=0)
     
     fig_heatmap = px.imshow(
         heatmap_pivot,
@@ -136,8 +158,7 @@ def export_all_images(base_path: str):
         color_continuous_scale='YlOrRd'
     )
     fig_heatmap.update_layout(height=500, width=1000)
-    fig_heatmap.write_image(os.path.join(img_dir, '05_demand_heatmap.png'), scale=2)
-    print("   ✅ Saved: 05_demand_heatmap.png")
+    figures.append((fig_heatmap, '05_demand_heatmap.png'))
     
     # --- 6. Trivariate Analysis ---
     print("\n6️⃣ Exporting Trivariate Analysis...")
@@ -155,8 +176,25 @@ def export_all_images(base_path: str):
     )
     fig_tri.add_vline(x=state_df['sps_score'].median(), line_dash="dash", line_color="gray")
     fig_tri.add_hline(y=0, line_dash="dash", line_color="gray")
-    fig_tri.write_image(os.path.join(img_dir, '06_trivariate_analysis.png'), scale=2)
-    print("   ✅ Saved: 06_trivariate_analysis.png")
+    figures.append((fig_tri, '06_trivariate_analysis.png'))
+    
+    # --- Render ---
+    # Kaleido's single renderer process answers one request at a time, so the
+    # figures are rendered in turn; only each image's Pillow quantize and save
+    # runs in the pool, overlapping the next render
+    print("\n🖨️ Rendering images...")
+    
+    def save(png_bytes, name):
+        # Quantize straight from the rendered bytes, so each file is written once
+        image = Image.open(BytesIO(png_bytes)).convert('RGB')
+        image = image.quantize(colors=PNG_COLORS, method=Image.Quantize.MEDIANCUT)
+        image.save(os.path.join(img_dir, name), optimize=True)
+        return name
+    
+    with ThreadPoolExecutor() as executor:
+        futures = [executor.submit(save, pio.to_image(fig, format='png', scale=2), name) for fig, name in figures]
+        for future in futures:
+            print(f"   ✅ Saved: {future.result()}")
     
     # --- Summary ---
     print("\n" + "=" * 60)
@@ -1,122 +1,253 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 import os
-import json
-import urllib.request
+import hashlib
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from data_cache import INDIA_GEOJSON_URL, load_clean, load_india_geojson
+
+# Map state names to GeoJSON ST_NM property names
+STATE_NAME_MAP = {
+    'Andaman & Nicobar Islands': 'Andaman & Nicobar',
+    'Dadra & Nagar Haveli': 'Dadra and Nagar Haveli and Daman and Diu',
+    'Daman & Diu': 'Dadra and Nagar Haveli and Daman and Diu',
+}
+
+# write_html options: link plotly.js from the CDN instead of inlining the ~3 MB
+# bundle into every file, and skip re-validating figures plotly built itself
+HTML_OPTIONS = dict(include_plotlyjs='cdn', full_html=True, validate=False)
+
+def _load_clean_frames(base_path):
+    """
+    Loads the district, state and trends outputs: only the columns the charts
+    use, with numeric columns already downcast (int32 / float32) by load_clean.
+    """
+    dist_df = load_clean(base_path, 'district', ('state', 'district', 'total_child_activity', 'clcs_zscore'))
+    state_df = load_clean(base_path, 'state', ('state', 'compliance_share'))
+    trend_df = load_clean(base_path, 'trends', ('month', 'season_type', 'volume'))
+    return dist_df, state_df, trend_df
+
+def _map_input_key(state_df):
+    """BLAKE2 digest of everything the state map is built from, code included."""
+    import plotly
+    h = hashlib.blake2b(digest_size=16)
+    # Editing this module (map code, STATE_NAME_MAP) or the GeoJSON loader, or
+    # upgrading plotly, rebuilds the map; keyed on mtimes like
+    # analysis.source_signature
+    code_files = [__file__, inspect.getfile(inspect.unwrap(load_india_geojson))]
+    h.update(repr([(path, os.path.getmtime(path)) for path in code_files]).encode('utf-8'))
+    h.update(plotly.__version__.encode('utf-8'))
+    h.update('\0'.join(state_df['state'].astype(str)).encode('utf-8'))
+    h.update(state_df['compliance_share'].to_numpy(dtype=np.float32).tobytes())
+    # The boundaries URL pins a gist revision, so it stands in for the file
+    h.update(INDIA_GEOJSON_URL.encode('utf-8'))
+    return h.hexdigest()
+
+def _build_state_map(state_df, india_states, output_dir):
+    """State compliance z-score choropleth (skipped when its inputs are unchanged)."""
+    import plotly.express as px
+    map_path = os.path.join(output_dir, 'map_state_clcs_zscore.html')
+    hash_path = os.path.join(output_dir, '.map_state_clcs_zscore.hash')
+    key = _map_input_key(state_df)
+    if os.path.exists(map_path) and os.path.exists(hash_path):
+        with open(hash_path) as f:
+            if f.read().strip() == key:
+                print("   State map unchanged, skipping")
+                return
+
+    # Calculate State Z-Score dynamically for the map
+    # On the raw float32 array (NaN-skipping like the Series methods)
+    share = state_df['compliance_share'].to_numpy(dtype=np.float32)
+    state_df['z_score'] = (share - np.nanmean(share)) / np.nanstd(share, ddof=1)
+
+    # Dict lookup, keeping names that need no remap (two states merge into
+    # one GeoJSON name, so the categories cannot simply be renamed)
+    states = state_df['state'].astype(str)
+    state_df['state_geo'] = states.map(STATE_NAME_MAP).fillna(states)
+
+    # Embed only the boundaries of states being plotted (a new dict: the
+    # loaded GeoJSON is cached and shared)
+    wanted = set(state_df['state_geo'])
+    india_states = {
+        **india_states,
+        'features': [f for f in india_states['features'] if f['properties']['ST_NM'] in wanted]
+    }
+
+    fig_map_clcs = px.choropleth(
+        state_df,
+        geojson=india_states,
+        featureidkey='properties.ST_NM',
+        locations='state_geo',
+        color='z_score',
+        color_continuous_scale='RdYlGn',
+        range_color=[-2, 2],
+        title='State Compliance Z-Score (Deviation from National Avg)',
+        template='plotly_dark',
+        hover_name='state'
+    )
+
+    # Use lat/lon bounds to ensure J&K and Ladakh are visible
+    fig_map_clcs.update_geos(
+        visible=False,
+        fitbounds="locations",
+        projection_type="natural earth"
+    )
+    fig_map_clcs.update_layout(
+        height=800,
+        margin=dict(l=0, r=0, t=50, b=0),
+        geo=dict(
+            lonaxis_range=[68, 98],  # Longitude range for India
+            lataxis_range=[6, 38],   # Latitude range including J&K and Ladakh
+        )
+    )
+    fig_map_clcs.write_html(map_path, **HTML_OPTIONS)
+    # Written after the HTML, so an interrupted write is rebuilt next run; the
+    # rename keeps a half-written sidecar from ever being read
+    partial_path = hash_path + '.part'
+    with open(partial_path, 'w') as f:
+        f.write(key)
+    os.replace(partial_path, hash_path)
+
+def _national_trend(trend_df):
+    """
+    National volume per (month, season), like
+    groupby(['month', 'season_type'], observed=True)['volume'].sum().
+
+    np.bincount over one flattened month x season cell index, as in
+    analysis.group_sums: NaN volumes count as 0, float volumes keep their
+    fractions and integer volumes sum to int64. Rows without a month or
+    season are reported and left out.
+    """
+    months, month_values = pd.factorize(trend_df['month'], sort=True)
+    seasons, season_values = pd.factorize(trend_df['season_type'], sort=True)
+    keep = (months >= 0) & (seasons >= 0)
+    if not keep.all():
+        print(f"   Skipped {np.count_nonzero(~keep):,} trend rows with no month or season")
+
+    n_seasons = len(season_values)
+    n_cells = len(month_values) * n_seasons
+    cells = months[keep].astype(np.intp) * n_seasons + seasons[keep]
+    volume = trend_df['volume']
+    weights = volume.to_numpy('float64', na_value=0)[keep]
+    totals = np.bincount(cells, weights=weights, minlength=n_cells)
+    if pd.api.types.is_integer_dtype(volume):
+        totals = totals.astype(np.int64)
+    # Cells that received rows, in (month, season) order like a sorted groupby
+    present = np.flatnonzero(np.bincount(cells, minlength=n_cells))
+    month_idx, season_idx = np.divmod(present, n_seasons)
+
+    # Months ('YYYY-MM') stay codes into their sorted uniques: an ordered
+    # categorical, rather than a per-row string column
+    return pd.DataFrame({
+        'month': pd.Categorical.from_codes(month_idx, categories=month_values.astype(str), ordered=True),
+        'season_type': season_values[season_idx],
+        'volume': totals[present]
+    })
+
+def _build_trend_chart(trend_df, output_dir):
+    """National monthly volume bar chart, coloured by season."""
+    import plotly.express as px
+    national_trend = _national_trend(trend_df)
+
+    fig_trend = px.bar(
+        national_trend,
+        x='month',
+        y='volume',
+        color='season_type', # Highlights School Rush vs Normal
+        title='National Activity Volume & Seasonality (School Rush Detection)',
+        template='plotly_dark',
+        color_discrete_map={'Normal': 'gray', 'School Rush': 'red', 'Year End': 'orange'},
+        category_orders={'month': list(national_trend['month'].cat.categories)}
+    )
+    fig_trend.write_html(os.path.join(output_dir, 'trend_seasonality.html'), **HTML_OPTIONS)
+
+def _build_risk_scatter(dist_df, output_dir):
+    """District compliance z-score vs child activity scatter."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    # Filter for active districts
+    active_dist = dist_df.iloc[np.flatnonzero(dist_df['total_child_activity'].to_numpy() > 1000)]
+
+    # One WebGL trace for all districts, coloured per state through a colour
+    # array, instead of one trace (and marker dict) per state
+    codes, states = pd.factorize(active_dist['state'], sort=True)
+    palette = np.array(px.colors.qualitative.Plotly)
+    fig_scatter = go.Figure(go.Scattergl(
+        x=active_dist['total_child_activity'],
+        y=active_dist['clcs_zscore'],
+        mode='markers',
+        marker=dict(color=palette[codes % len(palette)]),
+        text=active_dist['district'].astype(str),
+        customdata=np.asarray(states.astype(str))[codes],
+        hovertemplate='<b>%{text}</b><br>State: %{customdata}<br>'
+                      'Child Activity Volume: %{x}<br>Compliance Z-Score (Std Dev): %{y}<extra></extra>',
+        showlegend=False
+    ))
+    # No legend: one trace cannot toggle states, and the cycled palette
+    # repeats colours, so the state is read from the hover text instead
+    fig_scatter.update_layout(
+        title='District Risk Analysis: Z-Score vs Volume',
+        xaxis_title='Child Activity Volume',
+        yaxis_title='Compliance Z-Score (Std Dev)',
+        template='plotly_dark'
+    )
+    # Add Risk Threshold line at -1.5 STD
+    fig_scatter.add_hline(y=-1.5, line_dash="dash", line_color="red", annotation_text="High Risk Zone (-1.5σ)")
+    fig_scatter.write_html(os.path.join(output_dir, 'chart_risk_zscore.html'), **HTML_OPTIONS)
+
+def _configure_plotly():
+    """Imports plotly on first use (it is slow to import) and sets the JSON engine."""
+    # Imported here, before the chart threads start, so the builders' own
+    # imports only hit sys.modules
+    import plotly.express  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    import plotly.io as pio
+    # Encode figures with orjson (C encoder, native numpy arrays) when installed
+    try:
+        import orjson  # noqa: F401
+        pio.json.config.default_engine = 'orjson'
+    except ImportError:
+        pass
 
 def generate_visualizations(base_path):
     print("--- Generating Phase 3 Visualizations (Cleaned & Z-Scored) ---")
-    
+
     # Load CLEAN Data
     district_path = os.path.join(base_path, 'aadhaar_pulse_district_clean.csv')
-    state_path = os.path.join(base_path, 'aadhaar_pulse_state_clean.csv')
-    trends_path = os.path.join(base_path, 'aadhaar_pulse_trends_clean.csv')
-    
+
     if not os.path.exists(district_path):
         print("Clean Analysis files not found. Run analysis.py first.")
         return
 
-    dist_df = pd.read_csv(district_path)
-    state_df = pd.read_csv(state_path)
-    trend_df = pd.read_csv(trends_path)
-    
+    _configure_plotly()
+    dist_df, state_df, trend_df = _load_clean_frames(base_path)
+
     output_dir = os.path.join(base_path, 'visualizations')
     os.makedirs(output_dir, exist_ok=True)
-    
+
     # --- 1. India Map (State Level) with Complete Boundaries (incl. J&K, Ladakh) ---
     print("Generating Clean Maps with Complete India Boundaries...")
-    
-    # GeoJSON includes J&K and Ladakh
-    geojson_url = "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson"
+
     india_states = None
-    
+
     try:
-        with urllib.request.urlopen(geojson_url) as url:
-            india_states = json.loads(url.read().decode())
+        # Downloaded on first use, then read from the local cache
+        india_states = load_india_geojson(base_path)
         print("   Loaded complete India GeoJSON (with J&K, Ladakh)")
     except Exception as e:
         print(f"   GeoJSON Error: {e}")
 
-    if india_states:
-        # Calculate State Z-Score dynamically for the map
-        state_mean = state_df['compliance_share'].mean()
-        state_std = state_df['compliance_share'].std()
-        state_df['z_score'] = (state_df['compliance_share'] - state_mean) / state_std
-        
-        # Map state names to GeoJSON ST_NM property names
-        state_name_map = {
-            'Andaman & Nicobar Islands': 'Andaman & Nicobar',
-            'Dadra & Nagar Haveli': 'Dadra and Nagar Haveli and Daman and Diu',
-            'Daman & Diu': 'Dadra and Nagar Haveli and Daman and Diu',
-        }
-        state_df['state_geo'] = state_df['state'].map(lambda x: state_name_map.get(x, x))
-        
-        fig_map_clcs = px.choropleth(
-            state_df,
-            geojson=india_states,
-            featureidkey='properties.ST_NM',
-            locations='state_geo',
-            color='z_score',
-            color_continuous_scale='RdYlGn', 
-            range_color=[-2, 2],
-            title='State Compliance Z-Score (Deviation from National Avg)',
-            template='plotly_dark',
-            hover_name='state'
-        )
-        
-        # Use lat/lon bounds to ensure J&K and Ladakh are visible
-        fig_map_clcs.update_geos(
-            visible=False,
-            fitbounds="locations",
-            projection_type="natural earth"
-        )
-        fig_map_clcs.update_layout(
-            height=800, 
-            margin=dict(l=0, r=0, t=50, b=0),
-            geo=dict(
-                lonaxis_range=[68, 98],  # Longitude range for India
-                lataxis_range=[6, 38],   # Latitude range including J&K and Ladakh
-            )
-        )
-        fig_map_clcs.write_html(os.path.join(output_dir, 'map_state_clcs_zscore.html'))
-
-    # --- 2. Seasonality Trend ---
-    print("Generating Trends with Seasonality...")
-    # Aggregate National
-    national_trend = trend_df.groupby(['month', 'season_type'])['volume'].sum().reset_index()
-    national_trend['month'] = national_trend['month'].astype(str)
-    
-    fig_trend = px.bar(
-        national_trend,
-        x='month',
-        y='volume',
-        color='season_type', # Highlights School Rush vs Normal
-        title='National Activity Volume & Seasonality (School Rush Detection)',
-        template='plotly_dark',
-        color_discrete_map={'Normal': 'gray', 'School Rush': 'red', 'Year End': 'orange'}
-    )
-    fig_trend.write_html(os.path.join(output_dir, 'trend_seasonality.html'))
-    
-    # --- 3. District Risk Scatter (Z-Score) ---
-    print("Generating Risk Scatter...")
-    
-    # Filter for active districts
-    active_dist = dist_df[dist_df['total_child_activity'] > 1000]
-    
-    fig_scatter = px.scatter(
-        active_dist,
-        x='total_child_activity',
-        y='clcs_zscore',
-        color='state',
-        hover_name='district',
-        title='District Risk Analysis: Z-Score vs Volume',
-        labels={'clcs_zscore': 'Compliance Z-Score (Std Dev)', 'total_child_activity': 'Child Activity Volume'},
-        template='plotly_dark'
-    )
-    # Add Risk Threshold line at -1.5 STD
-    fig_scatter.add_hline(y=-1.5, line_dash="dash", line_color="red", annotation_text="High Risk Zone (-1.5σ)")
-    fig_scatter.write_html(os.path.join(output_dir, 'chart_risk_zscore.html'))
+    # The three charts share no data once loaded; build and write them in
+    # parallel (serialization and file writes overlap)
+    print("Generating Trends with Seasonality and Risk Scatter...")
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = []
+        if india_states:
+            futures.append(pool.submit(_build_state_map, state_df, india_states, output_dir))
+        futures.append(pool.submit(_build_trend_chart, trend_df, output_dir))
+        futures.append(pool.submit(_build_risk_scatter, dist_df, output_dir))
+        for future in futures:
+            future.result()
 
     print(f"Visualizations saved to {output_dir}")
 
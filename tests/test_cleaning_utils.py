@@ -0,0 +1,43 @@
+"""
+Checks the Arrow-based district cleaning against the original per-row
+pandas string pipeline.
+"""
+
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cleaning_utils import normalize_district_names
+
+
+def reference_district_clean(names):
+    """The original str-accessor cleaning (names absent from the alias map)."""
+    s = pd.Series(names, dtype=object).astype(str).str.strip().str.title()
+    s = s.replace(r'\s+', ' ', regex=True).replace(r'\.', '', regex=True)
+    mask_valid = (
+        s.str.contains(r'[a-zA-Z]') & (s.str.len() > 2)
+        & ~s.str.contains(r'^\d+$') & ~s.isin(['100000', '5th Cross', 'System'])
+    )
+    return s[mask_valid].tolist()
+
+
+class NormalizeDistrictWhitespaceTest(unittest.TestCase):
+
+    def test_unicode_whitespace_matches_reference(self):
+        # Whitespace that Python's \s matches but RE2's \s does not
+        spaces = ['\xa0', '\u2003', '\u3000', '\u2028', '\v', '\x1c', '\x85', '\t \xa0']
+        names = [f'north{sp}goa' for sp in spaces] + [f'{sp}east{sp}{sp}khasi hills{sp}' for sp in spaces]
+        df = pd.DataFrame({'district': names})
+
+        cleaned = normalize_district_names(df)['district'].astype(str).tolist()
+
+        self.assertEqual(cleaned, reference_district_clean(names))
+        self.assertEqual(set(cleaned), {'North Goa', 'East Khasi Hills'})
+
+
+if __name__ == '__main__':
+    unittest.main()
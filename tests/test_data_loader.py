@@ -0,0 +1,80 @@
+"""
+Checks that load_and_merge_data merges every file pandas would have merged
+(float-formatted counts, stray tokens, conflicting inferred types).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_loader import load_and_merge_data
+
+
+def write_csv(directory, name, lines):
+    with open(os.path.join(directory, name), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+class LoadAndMergeDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.base_path, 'bio')
+        os.makedirs(self.data_dir)
+
+    def load(self):
+        return load_and_merge_data(self.base_path, 'bio/*.csv', use_cache=False)
+
+    def test_float_formatted_counts_are_not_dropped(self):
+        header = 'date,state,district,pincode,bio_age_5_17,bio_age_17_'
+        write_csv(self.data_dir, 'a.csv', [
+            header, '01-03-2025,Goa,North Goa,403001,5,7',
+        ])
+        # As pandas writes a count column that holds a NaN
+        write_csv(self.data_dir, 'b.csv', [
+            header, '01-03-2025,Goa,South Goa,403601,21.0,',
+            '02-03-2025,Goa,South Goa,403602,3.0,4.0',
+        ])
+
+        df = self.load()
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df['bio_age_5_17'].sum(), 29)
+        self.assertEqual(df['bio_age_17_'].sum(), 11)
+
+    def test_non_integer_pincode_is_not_dropped(self):
+        header = 'date,state,district,pincode,bio_age_5_17'
+        write_csv(self.data_dir, 'a.csv', [
+            header, '01-03-2025,Goa,North Goa,403001,5',
+        ])
+        write_csv(self.data_dir, 'b.csv', [
+            header, '01-03-2025,Goa,South Goa,4036O1,2',
+        ])
+
+        df = self.load()
+
+        self.assertEqual(len(df), 2)
+        self.assertEqual(df['bio_age_5_17'].sum(), 7)
+
+    def test_conflicting_inferred_types_are_merged(self):
+        header = 'date,state,district,pincode,bio_age_5_17,remarks'
+        write_csv(self.data_dir, 'a.csv', [
+            header, '01-03-2025,Goa,North Goa,403001,5,1',
+        ])
+        # 'remarks' is int64 in one file and string in the other
+        write_csv(self.data_dir, 'b.csv', [
+            header, '01-03-2025,Goa,South Goa,403601,2,late',
+        ])
+
+        df = self.load()
+
+        self.assertEqual(len(df), 2)
+        self.assertEqual(df['remarks'].tolist(), ['1', 'late'])
+        self.assertEqual(df['bio_age_5_17'].sum(), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Checks the national trend grid behind the seasonality chart against a
+pandas groupby.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from visualization import _national_trend
+
+
+class NationalTrendTest(unittest.TestCase):
+
+    def assert_matches_groupby(self, trend_df):
+        expected = (
+            trend_df.groupby(['month', 'season_type'], observed=True)['volume'].sum()
+            .reset_index()
+        )
+        result = _national_trend(trend_df)
+
+        self.assertEqual(result['month'].astype(str).tolist(), expected['month'].astype(str).tolist())
+        self.assertEqual(result['season_type'].astype(str).tolist(), expected['season_type'].astype(str).tolist())
+        np.testing.assert_allclose(result['volume'].to_numpy(), expected['volume'].to_numpy())
+
+    def make_trends(self, volume):
+        return pd.DataFrame({
+            'month': ['2025-06', '2025-02', '2025-06', '2025-12', None, '2025-02'],
+            'season_type': pd.Categorical(['School Rush', 'Normal', 'School Rush', 'Year End', 'Normal', np.nan]),
+            'volume': volume,
+        })
+
+    def test_integer_volumes(self):
+        trend_df = self.make_trends(np.array([5, 7, 11, 13, 17, 19], dtype=np.int32))
+        self.assert_matches_groupby(trend_df)
+        self.assertTrue(pd.api.types.is_integer_dtype(_national_trend(trend_df)['volume']))
+
+    def test_fractional_and_missing_volumes(self):
+        trend_df = self.make_trends(np.array([0.5, 7.25, np.nan, 13.0, 17.0, 1.0], dtype=np.float32))
+        self.assert_matches_groupby(trend_df)
+        self.assertEqual(_national_trend(trend_df)['volume'].tolist(), [7.25, 0.5, 13.0])
+
+
+if __name__ == '__main__':
+    unittest.main()